@@ -1,36 +1,215 @@
+import queue
+import socket
+import struct
+import threading
+import time
+
 import cv2
 import mediapipe as mp
 import numpy as np
-from pythonosc import udp_client
+from numba import njit
+from pythonosc import osc_message_builder
+
+# Per-hand metric layout: every per-hand state array is indexed [hand, metric]
+METRIC_NAMES = (
+    "tip_to_mcp_0", "tip_to_mcp_1", "tip_to_mcp_2", "tip_to_mcp_3",
+    "thumb_to_index_mcp", "avg_tip_to_wrist", "mcp_to_mcp", "camera_distance"
+)
+N_METRICS = len(METRIC_NAMES)
+# Hands are referred to by index everywhere; labels are only for display/OSC addresses
+LEFT, RIGHT = 0, 1
+HAND_LABELS = ("Left", "Right")
+OSC_ADDRESSES = tuple(f"/hand/{label.lower()}" for label in HAND_LABELS)
+# On-screen metric labels, e.g. "Left tip_to_mcp_0"
+DRAW_LABELS = tuple(tuple(f"{label} {name}" for name in METRIC_NAMES) for label in HAND_LABELS)
+
+# OSC bundle header: "#bundle" + the "immediately" time tag
+OSC_BUNDLE_HDR = b"#bundle\0" + struct.pack(">Q", 1)
+OSC_PAYLOAD = struct.Struct(f">{N_METRICS}f")
+
+# pollKey (OpenCV >= 4.5) pumps HighGUI events without the 1 ms sleep of waitKey(1)
+poll_key = getattr(cv2, "pollKey", None) or (lambda: cv2.waitKey(1))
+
+
+def osc_element_header(address):
+    """Bytes preceding the float payload of a bundled /hand/* message: element size, address, type tags."""
+    msg = osc_message_builder.OscMessageBuilder(address=address)
+    for _ in range(N_METRICS):
+        msg.add_arg(0.0, osc_message_builder.OscMessageBuilder.ARG_TYPE_FLOAT)
+    dgram = msg.build().dgram
+    return struct.pack(">i", len(dgram)) + dgram[:-OSC_PAYLOAD.size]
+
+
+@njit(cache=True)
+def update_normalize_smooth(raw, gmin, gmax, fmin, fmax, buf, bsum, bidx, bcnt, h, out):
+    """
+    One pass over the metrics of hand index h: update the global range, normalize
+    to [0,1] and push into the moving-average ring buffer. Writes the smoothed
+    values into out[h].
+    Per metric the range is:
+     - fixed_min/fixed_max where calibrated (NaN = not calibrated)
+     - global_min/global_max otherwise
+    """
+    size = buf.shape[2]
+    idx = bidx[h]
+    cnt = min(bcnt[h] + 1, size)
+    for m in range(raw.shape[0]):
+        v = raw[m]
+        if v < gmin[h, m]:
+            gmin[h, m] = v
+        if v > gmax[h, m]:
+            gmax[h, m] = v
+
+        lo = gmin[h, m] if np.isnan(fmin[h, m]) else fmin[h, m]
+        hi = gmax[h, m] if np.isnan(fmax[h, m]) else fmax[h, m]
+        span = hi - lo
+        # Avoid division by zero: degenerate ranges map to 0
+        norm = 0.0
+        if span >= 1e-9:
+            norm = min(max((v - lo) / span, 0.0), 1.0)
+
+        bsum[h, m] += norm - buf[h, m, idx]
+        buf[h, m, idx] = norm
+        # clip away float drift of the running sum
+        out[h, m] = min(max(bsum[h, m] / cnt, 0.0), 1.0)
+    bidx[h] = (idx + 1) % size
+    bcnt[h] = cnt
+
 
 class WorkingSqueezeTracker:
+    # MediaPipe landmark indices (thumb excluded for tip_to_mcp computation)
+    TIPS = np.array([8, 12, 16, 20])
+    MCPS = np.array([5, 9, 13, 17])
+    WRISTS = np.zeros(4, dtype=int)
+
+    # all 6 unordered MCP pairs, for the mean pairwise MCP spread
+    MCP_PAIR_A = MCPS[np.triu_indices(4, 1)[0]]
+    MCP_PAIR_B = MCPS[np.triu_indices(4, 1)[1]]
+
+    # index_mcp -> pinky_mcp, wrist -> middle_mcp, thumb_tip -> middle_mcp
+    # (index 9 is middle_mcp in Mediapipe, used as the "index_mcp" scale anchor)
+    ANCHOR_A = np.array([5, 0, 4])
+    ANCHOR_B = np.array([17, 9, 9])
+
+    # Every landmark pair measured per frame, so one gather + norm yields all distances:
+    # [0:3] anchors, [3:7] tip -> mcp, [7:11] tip -> wrist, [11:17] MCP pairs
+    PAIR_A = np.concatenate([ANCHOR_A, TIPS, TIPS, MCP_PAIR_A])
+    PAIR_B = np.concatenate([ANCHOR_B, MCPS, WRISTS, MCP_PAIR_B])
+
+    SMOOTH_SIZE = 5
+
+    # Metric text block: first baseline TEXT_ASCENT below the block top, one line every TEXT_LINE px
+    TEXT_ASCENT = 14
+    TEXT_LINE = 18
+    TEXT_HEIGHT = TEXT_ASCENT + TEXT_LINE * (N_METRICS - 1) + 6
+
+    # Skeleton cache: reused while no landmark is more than SKELETON_MOVE_PX from where it was last
+    # drawn; SKELETON_MARGIN pads the landmark bbox to cover circle radii and line thickness
+    SKELETON_MOVE_PX = 2.0
+    SKELETON_MARGIN = 8
+
+    # Preallocated frame buffers, recycled through a free-slot queue: a slot goes back to the
+    # capture thread only after display has shown it or a full queue dropped it, and capture
+    # waits for a free slot rather than reusing one still held downstream. Sized for the most
+    # frames in flight (two queues of 2 plus one per stage) so capture normally never waits.
+    FRAME_POOL = 8
+
+    # Requested camera mode: MJPG avoids raw YUYV modes (often bandwidth-capped to low FPS) and
+    # their per-frame conversion; drivers that can't honour a setting just keep their default
+    CAPTURE_WIDTH = 640
+    CAPTURE_HEIGHT = 480
+    CAPTURE_FPS = 30
+
+    # MediaPipe runs on a downscaled copy (same aspect ratio); landmarks are normalized,
+    # so they still map onto the full-resolution display frame
+    INFER_WIDTH = 320
+
+    # Frame skipping on stable poses: MediaPipe runs every `interval` frames (1..MAX_SKIP_INTERVAL),
+    # reusing the last results in between. STABLE_DELTA is the max raw metric change (ratio of palm
+    # length) between processed frames that still counts as stable.
+    MAX_SKIP_INTERVAL = 3
+    STABLE_DELTA = 0.02
+
+    # Model switching: while only one hand is in view, a single-hand lite model replaces the
+    # two-hand full one. The hand count is tracked as an EMA (HAND_COUNT_ALPHA); below
+    # SINGLE_HAND_EMA the lite model is used, with a two-hand scan every RESCAN_SECONDS.
+    HAND_COUNT_ALPHA = 0.1
+    SINGLE_HAND_EMA = 1.3
+    RESCAN_SECONDS = 1.0
+
     def __init__(self, osc_host="127.0.0.1", osc_port=57120):
         # MediaPipe
         self.mp_hands = mp.solutions.hands
         self.mp_drawing = mp.solutions.drawing_utils
-        self.hands = self.mp_hands.Hands(
+        self.hands_two = self.mp_hands.Hands(
             static_image_mode=False,
             max_num_hands=2,
+            model_complexity=1,
+            min_detection_confidence=0.7,
+            min_tracking_confidence=0.7
+        )
+        self.hands_one = self.mp_hands.Hands(
+            static_image_mode=False,
+            max_num_hands=1,
+            model_complexity=0,
             min_detection_confidence=0.7,
             min_tracking_confidence=0.7
         )
 
         # OSC
-        self.osc = udp_client.SimpleUDPClient(osc_host, osc_port)
+        # Message layout never changes, so headers are serialized once and only floats are packed per frame.
+        # Non-blocking: a full send buffer drops the frame instead of stalling the pipeline.
+        family, _, _, _, self._osc_addr = socket.getaddrinfo(osc_host, osc_port, type=socket.SOCK_DGRAM)[0]
+        self._sock = socket.socket(family, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)
+        self._osc_hdr = tuple(osc_element_header(address) for address in OSC_ADDRESSES)
 
         # Running dynamic range (for auto-scaling learning)
-        self.global_min = {}
-        self.global_max = {}
-
-        # Fixed calibration: dicts keyed by "Left" or "Right", each mapping metric_name -> value
-        self.fixed_min = {"Left": {}, "Right": {}}
-        self.fixed_max = {"Left": {}, "Right": {}}
-
-        # Current instantaneous raw metric values (un-normalized, per frame)
-        self.current_values = {}
+        self.global_min = np.full((2, N_METRICS), np.inf, dtype=np.float32)
+        self.global_max = np.full((2, N_METRICS), -np.inf, dtype=np.float32)
+
+        # Fixed calibration per hand; NaN = not calibrated
+        self.fixed_min = np.full((2, N_METRICS), np.nan, dtype=np.float32)
+        self.fixed_max = np.full((2, N_METRICS), np.nan, dtype=np.float32)
+
+        # Current instantaneous raw metric values (un-normalized, per frame); NaN = hand not seen yet
+        self.current_values = np.full((2, N_METRICS), np.nan, dtype=np.float32)
+
+        # Smoothing buffers for normalized values: last SMOOTH_SIZE frames per hand
+        self.buffers = np.zeros((2, N_METRICS, self.SMOOTH_SIZE), dtype=np.float32)
+        self.buf_sum = np.zeros((2, N_METRICS), dtype=np.float64)  # running sum of each buffer
+        self.buf_idx = np.zeros(2, dtype=np.int32)
+        self.buf_count = np.zeros(2, dtype=np.int32)
+        self.smoothed = np.zeros((2, N_METRICS), dtype=np.float64)
+
+        # Pipeline threads: capture -> inference -> display (main thread)
+        self._stop = threading.Event()
+        self._free_slots = None  # frame pool slot indices, set up by run()
+        # guards metric/calibration state shared by the inference thread and key handling
+        self._state_lock = threading.Lock()
+
+        # Cached per-hand metric text image, re-rendered only when a displayed value changes
+        self._text_overlay = [None, None]
+        self._last_text_vals = np.full((2, N_METRICS), np.nan)
+        self._text_width = tuple(
+            max(cv2.getTextSize(f"{text}: 0.00", cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0][0] for text in texts) + 2
+            for texts in DRAW_LABELS
+        )
 
-        # Smoothing buffers for normalized values
-        self.buffers = {}
+        # Cached per-hand skeleton: (landmark pts last drawn, (x0, y0, bbox pixels, drawn mask) or None)
+        self._skeleton = [None, None]
+        self._skeleton_canvas = None
+
+        # Calibration controls (q = quit is handled by the main loop)
+        self._key_actions = {
+            ord('3'): lambda: self.lock_current_as_min(LEFT),
+            ord('4'): lambda: self.lock_current_as_max(LEFT),
+            ord('5'): lambda: self.lock_current_as_min(RIGHT),
+            ord('6'): lambda: self.lock_current_as_max(RIGHT),
+            ord('z'): lambda: self.clear_calibration_for(LEFT),
+            ord('x'): lambda: self.clear_calibration_for(RIGHT),
+            ord('c'): self.clear_all_calibration,
+        }
 
         print("Controls: q = quit, 3/4 = lock Left min/max, 5/6 = lock Right min/max, "
               "z = clear Left, x = clear Right, c = clear both")
@@ -39,127 +218,84 @@ class WorkingSqueezeTracker:
     # Utility helpers
     # ---------------------------
 
-    def distance(self, p1, p2, frame):
-        """Euclidean distance in pixels between two normalized landmarks, scaled to frame size."""
-        dx = (p1.x - p2.x) * frame.shape[1]
-        dy = (p1.y - p2.y) * frame.shape[0]
-        return float(np.sqrt(dx*dx + dy*dy))
+    @staticmethod
+    def _pair_dists(pts, idx_a, idx_b):
+        """Euclidean distances in pixels between landmark pairs pts[idx_a[k]] <-> pts[idx_b[k]]."""
+        return np.linalg.norm(pts[idx_a] - pts[idx_b], axis=1)
 
-    def smooth_value(self, key, value, size=5):
-        """Simple moving average smoother."""
-        buf = self.buffers.setdefault(key, [])
-        buf.append(value)
-        if len(buf) > size:
-            buf.pop(0)
-        return float(np.mean(buf))
+    @staticmethod
+    def _put_latest(q, item, on_drop=None):
+        """Put item on a bounded queue, dropping the oldest entry when full to keep latency low.
+        on_drop(entry) is called for every entry dropped."""
+        while True:
+            try:
+                q.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    dropped = q.get_nowait()
+                except queue.Empty:
+                    continue
+                if on_drop:
+                    on_drop(dropped)
+
+    def _release_slot(self, item):
+        """Return the frame pool slot of a pipeline item (slot index first) to the capture thread."""
+        self._free_slots.put(item[0])
 
     def detect_hand_side(self, hand_landmarks, handedness):
-        """Prefer MediaPipe handedness label; fallback to wrist vs middle MCP heuristic."""
+        """Hand index (LEFT/RIGHT). Prefer MediaPipe handedness label; fallback to wrist vs middle MCP heuristic."""
         if handedness and handedness.classification:
-            return handedness.classification[0].label  # 'Left' or 'Right'
+            return LEFT if handedness.classification[0].label == "Left" else RIGHT
         lm = hand_landmarks.landmark
         # If wrist.x < middle_mcp.x, then it's likely right-hand from camera perspective
-        return "Right" if lm[0].x < lm[9].x else "Left"
+        return RIGHT if lm[0].x < lm[9].x else LEFT
 
     # ---------------------------
     # Calibration functions
     # ---------------------------
 
-    def lock_current_as_min(self, hand):
-        """Lock current instantaneous values as fixed MIN for a hand."""
-        locked = 0
-        for k, v in self.current_values.items():
-            if k.startswith(hand + "_"):
-                self.fixed_min[hand][k] = float(v)
-                locked += 1
-        print(f"[CALIB] Locked MIN for {hand}: {locked} metrics")
-
-    def lock_current_as_max(self, hand):
-        """Lock current instantaneous values as fixed MAX for a hand."""
-        locked = 0
-        for k, v in self.current_values.items():
-            if k.startswith(hand + "_"):
-                self.fixed_max[hand][k] = float(v)
-                locked += 1
-        print(f"[CALIB] Locked MAX for {hand}: {locked} metrics")
-
-    def clear_calibration_for(self, hand):
-        self.fixed_min[hand].clear()
-        self.fixed_max[hand].clear()
-        print(f"[CALIB] Cleared calibration for {hand}")
+    def lock_current_as_min(self, h):
+        """Lock current instantaneous values as fixed MIN for hand index h."""
+        with self._state_lock:
+            self.fixed_min[h] = self.current_values[h]
+        locked = int(np.count_nonzero(~np.isnan(self.fixed_min[h])))
+        print(f"[CALIB] Locked MIN for {HAND_LABELS[h]}: {locked} metrics")
+
+    def lock_current_as_max(self, h):
+        """Lock current instantaneous values as fixed MAX for hand index h."""
+        with self._state_lock:
+            self.fixed_max[h] = self.current_values[h]
+        locked = int(np.count_nonzero(~np.isnan(self.fixed_max[h])))
+        print(f"[CALIB] Locked MAX for {HAND_LABELS[h]}: {locked} metrics")
+
+    def clear_calibration_for(self, h):
+        with self._state_lock:
+            self.fixed_min[h] = np.nan
+            self.fixed_max[h] = np.nan
+        print(f"[CALIB] Cleared calibration for {HAND_LABELS[h]}")
 
     def clear_all_calibration(self):
-        self.clear_calibration_for("Left")
-        self.clear_calibration_for("Right")
+        self.clear_calibration_for(LEFT)
+        self.clear_calibration_for(RIGHT)
         print("[CALIB] Cleared ALL calibration")
 
-    # ---------------------------
-    # Range / normalize
-    # ---------------------------
-
-    def update_global_range(self, key, value):
-        """Track dynamic global min/max for adaptive ranges (helps if user never calibrates)."""
-        if key not in self.global_min or value < self.global_min[key]:
-            self.global_min[key] = float(value)
-        if key not in self.global_max or value > self.global_max[key]:
-            self.global_max[key] = float(value)
-
-    def normalize(self, key, value):
-        """
-        Normalize value to [0,1].
-        Priority:
-         - If both fixed_min and fixed_max exist for this key -> use those (calibrated mode)
-         - If only one is present -> combine fixed with global other side
-         - Otherwise use global_min/global_max
-        """
-        hand = "Left" if key.startswith("Left_") else "Right"
-
-        has_fixed_min = key in self.fixed_min[hand]
-        has_fixed_max = key in self.fixed_max[hand]
-
-        if has_fixed_min and has_fixed_max:
-            min_val = self.fixed_min[hand][key]
-            max_val = self.fixed_max[hand][key]
-        elif has_fixed_min:
-            min_val = self.fixed_min[hand][key]
-            max_val = self.global_max.get(key, min_val + 1e-6)
-        elif has_fixed_max:
-            max_val = self.fixed_max[hand][key]
-            min_val = self.global_min.get(key, max_val - 1e-6)
-        else:
-            min_val = self.global_min.get(key, value)
-            max_val = self.global_max.get(key, value + 1e-6)
-
-        # Avoid division by zero
-        if (max_val - min_val) < 1e-9:
-            return 0.0
-
-        return float(np.clip((value - min_val) / (max_val - min_val), 0.0, 1.0))
-
     # ---------------------------
     # Hand processing
     # ---------------------------
 
-    def process_hand(self, hand_landmarks, frame, hand_label):
-        lm = hand_landmarks.landmark
-        wrist = lm[0]
-        # tips and mcps (thumb excluded for tip_to_mcp computation)
-        tip_indices = [8, 12, 16, 20]
-        mcp_indices = [5, 9, 13, 17]
-
-        tips = [lm[i] for i in tip_indices]
-        mcps = [lm[i] for i in mcp_indices]
+    def process_hand(self, hand_landmarks, frame, h):
+        height, width = frame.shape[:2]
+        # all 21 landmarks in pixel coordinates; one pass over the repeated field, no per-index lookups
+        pts = np.array([(p.x, p.y) for p in hand_landmarks.landmark], dtype=np.float32)
+        pts *= np.array([width, height], dtype=np.float32)
 
-        thumb_tip = lm[4]
-        index_mcp = lm[9]  # using middle finger MCP as scale anchor (index 9 is middle_mcp in Mediapipe)
+        # all pairwise distances in pixels, laid out as in PAIR_A/PAIR_B
+        dists = self._pair_dists(pts, self.PAIR_A, self.PAIR_B)
 
         # --- Camera distance estimation ---
-        index_mcp_true = lm[5]
-        pinky_mcp = lm[17]
-        middle_mcp = lm[9]
-
-        palm_width_px = self.distance(index_mcp_true, pinky_mcp, frame)
-        palm_height_px = self.distance(wrist, middle_mcp, frame)
+        # palm width (index_mcp -> pinky_mcp), palm height (wrist -> middle_mcp), thumb_tip -> middle_mcp
+        palm_width_px, palm_height_px, thumb_to_index_mcp_px = dists[0:3]
 
         hand_size = (palm_width_px + palm_height_px) * 0.5
 
@@ -167,178 +303,285 @@ class WorkingSqueezeTracker:
         camera_distance = 1.0 / (hand_size + 1e-6)
 
         # scale reference: wrist -> middle_mcp distance (non-zero if hand visible)
-        scale = self.distance(wrist, lm[9], frame)
+        scale = float(palm_height_px)
         if scale < 1e-6:
             scale = 1.0  # fallback so we don't divide by zero; will be normalized anyway
 
-        # compute absolute distances, then convert to scale-invariant ratios
-        tip_to_mcp_px = [self.distance(t, m, frame) for t, m in zip(tips, mcps)]
-        tip_to_mcp = [d / scale for d in tip_to_mcp_px]
-
-        thumb_to_index_mcp_px = self.distance(thumb_tip, index_mcp, frame)
-        thumb_to_index_mcp = thumb_to_index_mcp_px / scale
-
-        avg_tip_to_wrist_px = np.mean([self.distance(t, wrist, frame) for t in tips])
-        avg_tip_to_wrist = avg_tip_to_wrist_px / scale
-
-        # MCP-to-MCP cluster spread (mean pairwise) as ratio
-        pairwise = []
-        for i, m1 in enumerate(mcps):
-            for j, m2 in enumerate(mcps):
-                if j > i:
-                    pairwise.append(self.distance(m1, m2, frame))
-        mcp_to_mcp_px = np.mean(pairwise) if pairwise else 0.0
-        mcp_to_mcp = mcp_to_mcp_px / scale
-
-        # Raw (scaled) metrics list
-        raw_metrics = tip_to_mcp + [
-            thumb_to_index_mcp,
-            avg_tip_to_wrist,
-            mcp_to_mcp,
-            camera_distance
-        ]
+        # Raw metrics in METRIC_NAMES order, written straight into this hand's current_values row
+        # (kept for locking the current frame as calibration)
+        raw = self.current_values[h]
+        raw[0:4] = dists[3:7]
+        raw[4] = thumb_to_index_mcp_px
+        raw[5] = dists[7:11].sum() / 4
+        # MCP-to-MCP cluster spread (mean pairwise)
+        raw[6] = dists[11:17].sum() / 6
+        # absolute distances -> scale-invariant ratios
+        raw[:7] /= scale
+        raw[7] = camera_distance
 
-        # Names for metrics
-        metric_names = [f"{hand_label}_tip_to_mcp_{i}" for i in range(4)] + [
-            f"{hand_label}_thumb_to_index_mcp",
-            f"{hand_label}_avg_tip_to_wrist",
-            f"{hand_label}_mcp_to_mcp",
-            f"{hand_label}_camera_distance"
-        ]
+        metrics = self.update_metrics(h)
 
-        # Save current raw values (for locking current frame as calibration)
-        for key, val in zip(metric_names, raw_metrics):
-            self.current_values[key] = float(val)
+        # Compute a single "openness" metric (mean of finger tip-to-mcp normalized)
+        #openness = float(self.smoothed[h, :4].mean())
 
-        # Update global ranges (helpful if user never calibrates)
-        for key, val in zip(metric_names, raw_metrics):
-            self.update_global_range(key, val)
+        return metrics, hand_landmarks, pts
 
-        # Normalize & smooth
-        smoothed = []
-        normalized_map = {}
-        for key, val in zip(metric_names, raw_metrics):
-            norm = self.normalize(key, val)
-            sm = self.smooth_value(key, norm, size=5)
-            smoothed.append(sm)
-            normalized_map[key] = sm
+    def update_metrics(self, h):
+        """Run hand h's current raw values through range tracking, normalization and smoothing."""
+        # Update global ranges (helpful if user never calibrates), normalize & smooth
+        update_normalize_smooth(self.current_values[h], self.global_min, self.global_max, self.fixed_min,
+                                self.fixed_max, self.buffers, self.buf_sum, self.buf_idx, self.buf_count,
+                                h, self.smoothed)
+        # Metrics for visualization (copy: the smoothed row is overwritten next frame)
+        return self.smoothed[h].copy()
 
-        # Compute a single "openness" metric (mean of finger tip-to-mcp normalized)
-        #openness_keys = [f"{hand_label}_tip_to_mcp_{i}" for i in range(4)]
-        #openness_vals = [normalized_map[k] for k in openness_keys if k in normalized_map]
-        #openness = float(np.mean(openness_vals)) if openness_vals else 0.0
+    # ---------------------------
+    # OSC
+    # ---------------------------
 
-        # Send OSC: per-hand array plus openness separately
+    def send_osc(self, present):
+        """Send the smoothed metrics of the hands present this frame as a single OSC bundle."""
+        dgram = OSC_BUNDLE_HDR + b"".join(
+            self._osc_hdr[h] + OSC_PAYLOAD.pack(*self.smoothed[h]) for h in present
+        )
         try:
-            self.osc.send_message(f"/hand/{hand_label.lower()}", smoothed)
-            #self.osc.send_message(f"/hand/{hand_label.lower()}/openness", openness)
+            self._sock.sendto(dgram, self._osc_addr)
+        except BlockingIOError:
+            pass  # send buffer full: drop this frame, the next one supersedes it
         except Exception as e:
             # don't crash on OSC errors
             print("[OSC] send error:", e)
 
-        # Prepare metrics for visualization
-        metrics = normalized_map
-        #metrics[f"{hand_label}_openness"] = openness
-
-        return metrics, hand_landmarks
-
     # ---------------------------
     # Drawing
     # ---------------------------
 
-    def draw_visuals(self, frame, metrics, hand_label, lm):
+    def draw_visuals(self, frame, metrics, h, lm, pts):
         # left = left column, right = right column
-        if hand_label == "Left":
+        if h == LEFT:
             x = 10
-            y = 30
         else:
             x = frame.shape[1] - 260
-            y = 30
-
-        # draw numeric metrics
-        ordered_keys = [
-            f"{hand_label}_tip_to_mcp_{i}" for i in range(4)
-        ] + [
-            f"{hand_label}_thumb_to_index_mcp",
-            f"{hand_label}_avg_tip_to_wrist",
-            f"{hand_label}_mcp_to_mcp",
-            f"{hand_label}_camera_distance"
-        ]
-
-        for key in ordered_keys:
-            if key in metrics:
-                clean = key.split("_", 1)[1]
-                cv2.putText(frame, f"{hand_label} {clean}: {metrics[key]:.2f}", (x, y),
+        y = 30 - self.TEXT_ASCENT  # top of the text block (first baseline at y=30)
+
+        # draw numeric metrics, in METRIC_NAMES order: rendered white-on-black into a small cached
+        # image only when a displayed (2-decimal) value changes, then merged with a per-pixel max
+        width = min(self._text_width[h], frame.shape[1] - x)
+        overlay = self._text_overlay[h]
+        if overlay is None or overlay.shape[1] != width:
+            overlay = self._text_overlay[h] = np.zeros((self.TEXT_HEIGHT, width, 3), dtype=np.uint8)
+            self._last_text_vals[h] = np.nan
+
+        rounded = np.round(metrics, 2)
+        if not np.array_equal(rounded, self._last_text_vals[h]):
+            overlay[:] = 0
+            ty = self.TEXT_ASCENT
+            for label, value in zip(DRAW_LABELS[h], rounded.tolist()):
+                cv2.putText(overlay, f"{label}: {value:.2f}", (0, ty),
                             cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-                y += 18
+                ty += self.TEXT_LINE
+            self._last_text_vals[h] = rounded
 
+        # in place, no temporaries; with white glyphs on black, max() matches drawing the text
+        # directly (exactly for aliased LINE_8 text; antialiased edges come out a little thinner)
+        roi = frame[y:y + overlay.shape[0], x:x + overlay.shape[1]]
+        cv2.max(roi, overlay[:roi.shape[0], :roi.shape[1]], dst=roi)
 
         # draw landmarks if present
         if lm is not None:
+            self._draw_skeleton(frame, h, lm, pts)
+
+    def _draw_skeleton(self, frame, h, lm, pts):
+        """Draw the hand skeleton, reusing the last rendering while the landmarks stay put."""
+        cached = self._skeleton[h]
+        if cached is None or np.abs(pts - cached[0]).max() > self.SKELETON_MOVE_PX:
+            # moving hand: a cached copy would not be reused, so draw straight onto the frame
             self.mp_drawing.draw_landmarks(frame, lm, self.mp_hands.HAND_CONNECTIONS)
+            self._skeleton[h] = (pts, None)
+            return
+
+        if cached[1] is None:
+            # held still since the last draw (or a skipped frame reusing its landmarks): render once
+            # on a blank canvas and keep the hand's bbox with a mask of the pixels actually drawn
+            canvas = self._skeleton_canvas
+            if canvas is None or canvas.shape != frame.shape:
+                canvas = self._skeleton_canvas = np.zeros_like(frame)
+            height, width = frame.shape[:2]
+            x0, y0 = np.maximum(pts.min(axis=0).astype(int) - self.SKELETON_MARGIN, 0)
+            x1 = min(int(pts[:, 0].max()) + self.SKELETON_MARGIN + 1, width)
+            y1 = min(int(pts[:, 1].max()) + self.SKELETON_MARGIN + 1, height)
+            self.mp_drawing.draw_landmarks(canvas, lm, self.mp_hands.HAND_CONNECTIONS)
+            region = canvas[y0:y1, x0:x1].copy()
+            canvas[y0:y1, x0:x1] = 0
+            mask = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY) if region.size else None  # None: hand off-frame
+            cached = self._skeleton[h] = (pts, (x0, y0, region, mask))
+
+        x0, y0, region, mask = cached[1]
+        if mask is not None:
+            cv2.copyTo(region, mask, frame[y0:y0 + region.shape[0], x0:x0 + region.shape[1]])
 
     # ---------------------------
     # Main loop
     # ---------------------------
 
+    def _capture_loop(self, cap, frames):
+        """Capture thread: read, mirror and convert frames for inference."""
+        try:
+            raw = pool = None
+            while not self._stop.is_set():
+                try:
+                    slot = self._free_slots.get(timeout=0.1)
+                except queue.Empty:
+                    continue  # every buffer is still held downstream: don't read into any of them
+                ret, raw = cap.read(raw)
+                if not ret:
+                    print("Empty frame, exiting")
+                    break
+                if pool is None or pool[0][0].shape != raw.shape:
+                    h, w = raw.shape[:2]
+                    small_size = (self.INFER_WIDTH, max(1, round(h * self.INFER_WIDTH / w)))
+                    small = np.empty((small_size[1], small_size[0], 3), dtype=raw.dtype)
+                    pool = [(np.empty_like(raw), np.empty_like(small)) for _ in range(self.FRAME_POOL)]
+                frame, rgb = pool[slot]
+                cv2.flip(raw, 1, dst=frame)
+                cv2.resize(frame, small_size, dst=small, interpolation=cv2.INTER_AREA)
+                cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=rgb)
+                self._put_latest(frames, (slot, frame, rgb), self._release_slot)
+        finally:
+            self._stop.set()  # also on an exception, so the other stages shut down instead of waiting
+
+    def _inference_loop(self, frames, annotated):
+        """Inference thread: run MediaPipe and compute/send metrics for each captured frame."""
+        try:
+            last = None  # hands_out of the last processed frame, reused on skipped frames
+            last_raw = None
+            present = []
+            interval = 1
+            since = 0
+            hand_count_ema = 2.0
+            last_scan = time.monotonic()
+            while not self._stop.is_set():
+                try:
+                    slot, frame, rgb = frames.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+
+                since += 1
+                if last is not None and since < interval:
+                    # Reuse the last landmarks but keep the per-frame output: their raw values go through
+                    # the smoother again (so its window stays SMOOTH_SIZE frames) and out over OSC.
+                    # Copy first: the previous list may still be on the display queue.
+                    last = list(last)
+                    with self._state_lock:
+                        for h in present:
+                            last[h] = (self.update_metrics(h), *last[h][1:])
+                    self.send_osc(present)
+                    self._put_latest(annotated, (slot, frame, last), self._release_slot)
+                    continue
+                since = 0
+
+                now = time.monotonic()
+                single = hand_count_ema < self.SINGLE_HAND_EMA and now - last_scan < self.RESCAN_SECONDS
+                if not single:
+                    last_scan = now
+                results = (self.hands_one if single else self.hands_two).process(rgb)
+
+                # snap back to the two-hand model as soon as a second hand shows up
+                n_hands = len(results.multi_hand_landmarks or ())
+                if n_hands == 2:
+                    hand_count_ema = 2.0
+                else:
+                    hand_count_ema += self.HAND_COUNT_ALPHA * (n_hands - hand_count_ema)
+
+                # (metrics, landmarks) per hand index, None if not present
+                hands_out = [None, None]
+                if results.multi_hand_landmarks:
+                    with self._state_lock:
+                        for i, lm in enumerate(results.multi_hand_landmarks):
+                            handed = results.multi_handedness[i] if results.multi_handedness else None
+                            h = self.detect_hand_side(lm, handed)
+                            hands_out[h] = self.process_hand(lm, frame, h)
+
+                # One OSC bundle (one datagram) per frame for all hands present
+                present = [h for h, out in enumerate(hands_out) if out]
+                if present:
+                    self.send_osc(present)
+
+                # Adapt the skip interval: never skip without hands, restart on a hand appearing or
+                # disappearing, back off up to MAX_SKIP_INTERVAL while the pose stays stable
+                if not present:
+                    last = last_raw = None
+                    interval = 1
+                else:
+                    raw = self.current_values[present]
+                    if last is None or [h for h, out in enumerate(last) if out] != present:
+                        interval = 1
+                    elif np.max(np.abs(raw - last_raw)) < self.STABLE_DELTA:
+                        interval = min(interval + 1, self.MAX_SKIP_INTERVAL)
+                    else:
+                        interval = 2
+                    last, last_raw = hands_out, raw
+
+                self._put_latest(annotated, (slot, frame, hands_out), self._release_slot)
+        finally:
+            self._stop.set()
+
     def run(self, camera_index=0):
         cap = cv2.VideoCapture(camera_index)
         if not cap.isOpened():
             print("Error: cannot open camera")
             return
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.CAPTURE_WIDTH)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.CAPTURE_HEIGHT)
+        cap.set(cv2.CAP_PROP_FPS, self.CAPTURE_FPS)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # always hand out the newest frame, no backlog
         print("Camera opened")
 
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                print("Empty frame, exiting")
-                break
-            frame = cv2.flip(frame, 1)
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.hands.process(rgb)
-
-            left_metrics = right_metrics = None
-            left_lm = right_lm = None
-
-            if results.multi_hand_landmarks:
-                for i, lm in enumerate(results.multi_hand_landmarks):
-                    handed = results.multi_handedness[i] if results.multi_handedness else None
-                    side = self.detect_hand_side(lm, handed)
-                    metrics, landmarks = self.process_hand(lm, frame, side)
-                    if side == "Left":
-                        left_metrics, left_lm = metrics, landmarks
-                    else:
-                        right_metrics, right_lm = metrics, landmarks
-
-            if left_metrics:
-                self.draw_visuals(frame, left_metrics, "Left", left_lm)
-            if right_metrics:
-                self.draw_visuals(frame, right_metrics, "Right", right_lm)
-
-            cv2.imshow("Dynamic Hand Tracking (scale-invariant)", frame)
-            key = cv2.waitKey(1) & 0xFF
-
-            # Controls:
-            if key == ord('q'):
-                break
-            elif key == ord('3'):
-                self.lock_current_as_min("Left")
-            elif key == ord('4'):
-                self.lock_current_as_max("Left")
-            elif key == ord('5'):
-                self.lock_current_as_min("Right")
-            elif key == ord('6'):
-                self.lock_current_as_max("Right")
-            elif key == ord('z'):
-                self.clear_calibration_for("Left")
-            elif key == ord('x'):
-                self.clear_calibration_for("Right")
-            elif key == ord('c'):
-                self.clear_all_calibration()
-
-        cap.release()
-        cv2.destroyAllWindows()
-        print("Stopped")
+        # small queues, drop-oldest: capture of frame N+1 overlaps inference of N and display of N-1
+        frames = queue.Queue(maxsize=2)
+        annotated = queue.Queue(maxsize=2)
+        self._free_slots = queue.Queue()
+        for slot in range(self.FRAME_POOL):
+            self._free_slots.put(slot)
+        self._stop.clear()
+        workers = [
+            threading.Thread(target=self._capture_loop, args=(cap, frames), daemon=True),
+            threading.Thread(target=self._inference_loop, args=(frames, annotated), daemon=True),
+        ]
+        for t in workers:
+            t.start()
+
+        try:
+            # Display and key handling stay on the main thread (HighGUI requirement on some platforms)
+            while not self._stop.is_set():
+                try:
+                    slot, frame, hands_out = annotated.get(timeout=0.01)
+                except queue.Empty:
+                    frame = None
+
+                if frame is not None:
+                    for h, out in enumerate(hands_out):
+                        if out:
+                            self.draw_visuals(frame, out[0], h, out[1], out[2])
+                    cv2.imshow("Dynamic Hand Tracking (scale-invariant)", frame)
+                    self._free_slots.put(slot)
+
+                key = poll_key() & 0xFF
+
+                # Controls:
+                if key == ord('q'):
+                    break
+                action = self._key_actions.get(key)
+                if action:
+                    action()
+        finally:
+            self._stop.set()
+            for t in workers:
+                t.join()
+            cap.release()
+            cv2.destroyAllWindows()
+            print("Stopped")
 
 if __name__ == "__main__":
     tracker = WorkingSqueezeTracker()